@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Admission control for Acme Laser Guns MCP Server
+Token-bucket rate limits per session and per tool, plus a global
+concurrency limiter with a bounded queue that sheds load when full.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; carries a retry-after hint."""
+
+    def __init__(self, reason: str, retry_after: float, status_code: int = 503):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+@dataclass
+class AdmissionConfig:
+    """Admission limits. A rate or concurrency of 0 disables that limit."""
+
+    client_rate: float = 20.0
+    client_burst: int = 40
+    session_rate: float = 10.0
+    session_burst: int = 20
+    tool_rate: float = 2.0
+    tool_burst: int = 5
+    max_concurrent: int = 10
+    max_queue: int = 20
+    queue_timeout: float = 2.0
+    max_tracked_keys: int = 10000
+    max_body_bytes: int = 1024 * 1024
+    trust_forwarded_for: bool = False
+
+    @classmethod
+    def from_env(cls, environ: Optional[Dict[str, str]] = None) -> "AdmissionConfig":
+        """Build a config from MCP_* environment variables, falling back to defaults."""
+        environ = os.environ if environ is None else environ
+        defaults = cls()
+
+        def read(name: str, default, cast):
+            value = environ.get(name)
+            return default if value in (None, "") else cast(value)
+
+        return cls(
+            client_rate=read("MCP_CLIENT_RATE_LIMIT", defaults.client_rate, float),
+            client_burst=read("MCP_CLIENT_BURST", defaults.client_burst, int),
+            session_rate=read("MCP_SESSION_RATE_LIMIT", defaults.session_rate, float),
+            session_burst=read("MCP_SESSION_BURST", defaults.session_burst, int),
+            tool_rate=read("MCP_TOOL_RATE_LIMIT", defaults.tool_rate, float),
+            tool_burst=read("MCP_TOOL_BURST", defaults.tool_burst, int),
+            max_concurrent=read("MCP_MAX_CONCURRENT", defaults.max_concurrent, int),
+            max_queue=read("MCP_MAX_QUEUE", defaults.max_queue, int),
+            queue_timeout=read("MCP_QUEUE_TIMEOUT", defaults.queue_timeout, float),
+            max_tracked_keys=read("MCP_MAX_TRACKED_KEYS", defaults.max_tracked_keys, int),
+            max_body_bytes=read("MCP_MAX_BODY_BYTES", defaults.max_body_bytes, int),
+            trust_forwarded_for=read("MCP_TRUST_FORWARDED_FOR", defaults.trust_forwarded_for, _parse_bool),
+        )
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available. Returns 0 on success, else seconds to wait."""
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets keyed by caller, bounded by LRU eviction of idle keys."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self.buckets: "OrderedDict[Any, TokenBucket]" = OrderedDict()
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def check(self, key) -> float:
+        """Charge one request to `key`. Returns 0 if allowed, else retry-after seconds."""
+        if not self.enabled:
+            return 0.0
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, self.clock)
+            self.buckets[key] = bucket
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        retry_after = bucket.try_acquire()
+        if retry_after:
+            self.rejected += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tracked_keys": len(self.buckets),
+            "rejected": self.rejected,
+        }
+
+
+class ConcurrencyLimiter:
+    """Global in-flight limit with a bounded wait queue; sheds load when full."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+        self.in_flight = 0
+        self.queued = 0
+        self.shed = 0
+
+    @property
+    def retry_after(self) -> float:
+        return max(1.0, self.queue_timeout)
+
+    async def acquire(self):
+        """Take a free slot, else wait in the queue; raise Overloaded if it cannot queue
+        (queue full or queue_timeout <= 0) or the wait times out."""
+        if self.semaphore is not None and not self.semaphore.locked():
+            # A slot is free: acquire() returns without suspending
+            await self.semaphore.acquire()
+        elif self.semaphore is not None:
+            if self.queue_timeout <= 0:
+                self.shed += 1
+                raise Overloaded("Server overloaded: no free slot and queueing is disabled",
+                                 self.retry_after)
+            if self.queued >= self.max_queue:
+                self.shed += 1
+                raise Overloaded("Server overloaded: request queue is full", self.retry_after)
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                raise Overloaded("Server overloaded: timed out waiting in queue", self.retry_after)
+            finally:
+                self.queued -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.semaphore is not None,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "shed": self.shed,
+        }
+
+
+class _BodyTooLarge(Exception):
+    """Raised while buffering a request body that exceeds max_body_bytes."""
+
+
+def _tool_names(body: bytes) -> Tuple[str, ...]:
+    """Extract the tool names from a JSON-RPC tools/call request (single or batch)."""
+    try:
+        payload = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return ()
+    messages = payload if isinstance(payload, list) else [payload]
+    names = []
+    for message in messages:
+        if isinstance(message, dict) and message.get("method") == "tools/call":
+            params = message.get("params")
+            if isinstance(params, dict) and isinstance(params.get("name"), str):
+                names.append(params["name"])
+    return tuple(names)
+
+
+class AdmissionControl:
+    """Shared admission state: client, session and tool limiters plus the concurrency limiter."""
+
+    def __init__(self, config: Optional[AdmissionConfig] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.config = config or AdmissionConfig.from_env()
+        self.clients = RateLimiter(self.config.client_rate, self.config.client_burst,
+                                   self.config.max_tracked_keys, clock)
+        self.sessions = RateLimiter(self.config.session_rate, self.config.session_burst,
+                                    self.config.max_tracked_keys, clock)
+        self.tools = RateLimiter(self.config.tool_rate, self.config.tool_burst,
+                                 self.config.max_tracked_keys, clock)
+        self.concurrency = ConcurrencyLimiter(self.config.max_concurrent,
+                                              self.config.max_queue,
+                                              self.config.queue_timeout)
+
+    def check_rate(self, client: str, session: Optional[str] = None):
+        """Raise Overloaded if the client or session bucket is exhausted.
+
+        The client bucket is charged first: session IDs are client-supplied, so
+        rotating them must not buy a fresh burst or churn the session buckets.
+        """
+        retry_after = self.clients.check(client)
+        if retry_after:
+            raise Overloaded("Rate limit exceeded for client", retry_after, 429)
+        if session:
+            retry_after = self.sessions.check(session)
+            if retry_after:
+                raise Overloaded("Rate limit exceeded for session", retry_after, 429)
+
+    def check_tools(self, key: str, tools: Tuple[str, ...]):
+        """Raise Overloaded if any (session or client, tool) bucket is exhausted."""
+        for tool in tools:
+            retry_after = self.tools.check((key, tool))
+            if retry_after:
+                raise Overloaded(f"Rate limit exceeded for tool '{tool}'", retry_after, 429)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limits and counters, for the /health endpoint."""
+        return {
+            "config": asdict(self.config),
+            "client_rate_limit": self.clients.stats(),
+            "session_rate_limit": self.sessions.stats(),
+            "tool_rate_limit": self.tools.stats(),
+            "concurrency": self.concurrency.stats(),
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying AdmissionControl to MCP POST requests."""
+
+    def __init__(self, app, admission: AdmissionControl, paths: Tuple[str, ...] = ("/mcp",)):
+        self.app = app
+        self.admission = admission
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        # Only POSTs to the MCP endpoint carry JSON-RPC requests; GET opens a
+        # long-lived SSE stream that must not hold a concurrency slot, and
+        # trailing-slash redirects should not be charged twice.
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or scope["path"] not in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        client = self._client_key(scope, headers)
+        session = headers.get(b"mcp-session-id")
+        session = session.decode("latin-1") if session else None
+        try:
+            # Charge what the headers identify before reading the body, so
+            # callers already over their limit never get a body buffered
+            self.admission.check_rate(client, session)
+            body, receive = await self._buffer_body(receive, self.admission.config.max_body_bytes)
+            self.admission.check_tools(session or client, _tool_names(body))
+            await self.admission.concurrency.acquire()
+        except Overloaded as exc:
+            await self._reject(exc, scope, receive, send)
+            return
+        except _BodyTooLarge:
+            response = JSONResponse(status_code=413, content={"error": "Request body too large"})
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.admission.concurrency.release()
+
+    def _client_key(self, scope, headers) -> str:
+        """Caller's address; X-Forwarded-For is only used when explicitly trusted."""
+        forwarded_for = headers.get(b"x-forwarded-for")
+        if forwarded_for and self.admission.config.trust_forwarded_for:
+            # The last hop is the one appended by our own proxy; earlier
+            # entries are supplied by the client and can be forged.
+            return forwarded_for.decode("latin-1").split(",")[-1].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _buffer_body(receive, limit: int):
+        """Read the full request body and return it with a receive() that replays it.
+
+        Raises _BodyTooLarge once more than `limit` bytes have arrived.
+        """
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client disconnected before sending the body; replay the disconnect
+                async def replay_disconnect():
+                    return message
+                return b"", replay_disconnect
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                raise _BodyTooLarge()
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return body, replay
+
+    @staticmethod
+    async def _reject(exc: Overloaded, scope, receive, send):
+        retry_after = math.ceil(exc.retry_after)
+        response = JSONResponse(
+            status_code=exc.status_code,
+            content={"error": exc.reason, "retry_after": retry_after},
+            headers={"Retry-After": str(retry_after)},
+        )
+        await response(scope, receive, send)
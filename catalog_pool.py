@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Catalog pool for Acme Laser Guns MCP Server
+Serves several product catalogs from one process. Each catalog is loaded
+lazily into a shared LaserGunInterface and evicted under an LRU data-size budget.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from laser_gun_interface import LaserGunInterface
+
+DEFAULT_CATALOG = "acme"
+DEFAULT_DATA_BUDGET_MB = 64
+
+
+def _default_data_file() -> str:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, 'laser_guns.json')
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class CatalogLoadError(Exception):
+    """Raised when a configured catalog's data file is missing or cannot be read or parsed."""
+
+    def __init__(self, catalog: str, reason: str):
+        super().__init__(f"Failed to load catalog '{catalog}': {reason}")
+        self.catalog = catalog
+        self.reason = reason
+
+
+class CatalogPool:
+    """LRU pool of LaserGunInterface instances, one per catalog."""
+
+    def __init__(self, catalogs: Dict[str, str], default_catalog: str = DEFAULT_CATALOG,
+                 data_budget_bytes: int = DEFAULT_DATA_BUDGET_MB * 1024 * 1024):
+        if default_catalog not in catalogs:
+            raise ValueError(f"Default catalog '{default_catalog}' is not configured")
+        self.catalogs = dict(catalogs)
+        self.default_catalog = default_catalog
+        self.data_budget_bytes = data_budget_bytes
+        self.loaded: "OrderedDict[str, LaserGunInterface]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.loads = 0
+        self.evictions = 0
+        # The pool lock only guards bookkeeping; each catalog has its own load
+        # lock so a cold load never blocks lookups of other catalogs.
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in self.catalogs}
+
+    @classmethod
+    def from_env(cls, environ: Optional[Dict[str, str]] = None) -> "CatalogPool":
+        """Build a pool from environment variables.
+
+        LASER_GUNS_FILE sets the data file of the default catalog, CATALOG_DIR adds
+        every *.json file in a directory (named by file stem), CATALOGS adds
+        explicit "name=path" pairs separated by commas, and
+        CATALOG_DATA_BUDGET_MB bounds the size of the data files kept loaded.
+        A name configured twice raises ValueError.
+        """
+        environ = os.environ if environ is None else environ
+        default_catalog = environ.get("DEFAULT_CATALOG") or DEFAULT_CATALOG
+        default_file = environ.get("LASER_GUNS_FILE") or _default_data_file()
+        catalogs = {default_catalog: default_file}
+
+        def add(name: str, path: str, source: str):
+            if not name:
+                raise ValueError(f"Invalid {source} entry for {path}: catalog name is empty")
+            if name in catalogs:
+                raise ValueError(f"Catalog '{name}' from {source} is already configured "
+                                 f"with {catalogs[name]}")
+            catalogs[name] = path
+
+        catalog_dir = environ.get("CATALOG_DIR")
+        if catalog_dir:
+            for filename in sorted(os.listdir(catalog_dir)):
+                name, ext = os.path.splitext(filename)
+                path = os.path.join(catalog_dir, filename)
+                # The default catalog's own file may live in the same directory
+                if ext == ".json" and not (os.path.exists(default_file)
+                                           and os.path.samefile(path, default_file)):
+                    add(name, path, "CATALOG_DIR")
+
+        for entry in (environ.get("CATALOGS") or "").split(","):
+            if entry.strip():
+                name, _, path = entry.partition("=")
+                if not path:
+                    raise ValueError(f"Invalid CATALOGS entry '{entry}', expected name=path")
+                add(name.strip(), path.strip(), "CATALOGS")
+
+        budget_mb = float(environ.get("CATALOG_DATA_BUDGET_MB") or DEFAULT_DATA_BUDGET_MB)
+        return cls(catalogs, default_catalog, int(budget_mb * 1024 * 1024))
+
+    def names(self):
+        """Names of all configured catalogs."""
+        return sorted(self.catalogs)
+
+    def has(self, catalog: Optional[str] = None) -> bool:
+        """Whether a catalog is configured (None means the default catalog)."""
+        return (catalog or self.default_catalog) in self.catalogs
+
+    def get(self, catalog: Optional[str] = None) -> LaserGunInterface:
+        """Return the interface for a catalog, loading it on first use.
+
+        Raises KeyError for catalogs that are not configured and CatalogLoadError
+        when the catalog's data file is missing, unreadable or unparseable. A
+        missing file for the default catalog still loads as an empty catalog.
+        """
+        name = catalog or self.default_catalog
+        if name not in self.catalogs:
+            raise KeyError(name)
+        interface = self._lookup(name)
+        if interface is not None:
+            return interface
+        with self._load_locks[name]:
+            # Another thread may have loaded it while we waited
+            interface = self._lookup(name)
+            if interface is not None:
+                return interface
+            path = self.catalogs[name]
+            # Only the default catalog keeps the legacy empty-database fallback;
+            # a mistyped path for any other catalog is a configuration error
+            if name != self.default_catalog and not os.path.isfile(path):
+                raise CatalogLoadError(name, f"data file not found: {path}")
+            try:
+                interface = LaserGunInterface(path)
+            except (OSError, ValueError) as exc:
+                raise CatalogLoadError(name, str(exc)) from exc
+            with self._lock:
+                self.loaded[name] = interface
+                self.sizes[name] = _file_size(path)
+                self.loads += 1
+                self._evict()
+            return interface
+
+    def _lookup(self, name: str) -> Optional[LaserGunInterface]:
+        with self._lock:
+            interface = self.loaded.get(name)
+            if interface is not None:
+                self.loaded.move_to_end(name)
+            return interface
+
+    def _evict(self):
+        """Drop least recently used catalogs until the pool fits its budget.
+
+        The most recently used catalog is always kept, even if it alone exceeds the budget.
+        """
+        while self.data_bytes > self.data_budget_bytes and len(self.loaded) > 1:
+            name, _ = self.loaded.popitem(last=False)
+            del self.sizes[name]
+            self.evictions += 1
+
+    @property
+    def data_bytes(self) -> int:
+        """Combined data file size of the loaded catalogs.
+
+        This is not resident memory: parsed dicts and indexes take several times more.
+        """
+        return sum(self.sizes.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Pool state, for the /health endpoint."""
+        with self._lock:
+            return {
+                "default_catalog": self.default_catalog,
+                "configured": len(self.catalogs),
+                "loaded": list(self.loaded),
+                "data_bytes": self.data_bytes,
+                "data_budget_bytes": self.data_budget_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
@@ -16,15 +16,45 @@ class LaserGunInterface:
             data_file = os.path.join(script_dir, 'laser_guns.json')
         self.data_file = data_file
         self.laser_guns = self._load_laser_guns()
+        self._build_indexes()
     
     def _load_laser_guns(self) -> Dict:
         """Load laser gun data from JSON file."""
         try:
             with open(self.data_file, 'r') as f:
-                return json.load(f)
+                data = json.load(f)
         except FileNotFoundError:
             print(f"Warning: {self.data_file} not found. Using empty database.")
             return {}
+        if not isinstance(data, dict):
+            raise ValueError(f"{self.data_file} must contain a JSON object keyed by model")
+        return data
+    
+    def _build_indexes(self):
+        """Precompute category and price lookups so queries avoid rescanning the catalog.
+        
+        Rows with a missing or malformed category or price are left out of the
+        matching index with a warning; they are still returned by model lookups.
+        """
+        self._models_by_category: Dict[str, List[str]] = {}
+        self._categories: List[str] = []
+        self._prices: Dict[str, float] = {}
+        for model, specs in self.laser_guns.items():
+            try:
+                category = specs["category"]
+                self._models_by_category.setdefault(category.lower(), []).append(model)
+                if category not in self._categories:
+                    self._categories.append(category)
+            except (KeyError, TypeError, AttributeError):
+                print(f"Warning: {model} in {self.data_file} has no valid category. "
+                      f"Skipping it in category queries.")
+            try:
+                # Extract price as float (remove $ and ,)
+                price_str = specs["price"].replace("$", "").replace(",", "")
+                self._prices[model] = float(price_str)
+            except (KeyError, TypeError, AttributeError, ValueError):
+                print(f"Warning: {model} in {self.data_file} has no valid price. "
+                      f"Skipping it in price queries.")
     
     def get_all_laser_guns(self) -> Dict[str, Dict]:
         """Get specifications for all available laser guns from Acme Corp."""
@@ -36,25 +66,23 @@ class LaserGunInterface:
     
     def get_laser_guns_by_category(self, category: str) -> Dict[str, Dict]:
         """Get all laser guns in a specific category."""
-        return {model: specs for model, specs in self.laser_guns.items() 
-                if specs["category"].lower() == category.lower()}
+        return {model: self.laser_guns[model]
+                for model in self._models_by_category.get(category.lower(), [])}
     
     def get_laser_guns_by_price_range(self, min_price: float, max_price: float) -> Dict[str, Dict]:
         """Get laser guns within a specific price range (in USD)."""
-        result = {}
-        for model, specs in self.laser_guns.items():
-            # Extract price as float (remove $ and ,)
-            price_str = specs["price"].replace("$", "").replace(",", "")
-            price = float(price_str)
-            if min_price <= price <= max_price:
-                result[model] = specs
-        return result
+        return {model: self.laser_guns[model] for model, price in self._prices.items()
+                if min_price <= price <= max_price}
     
     def get_random_laser_gun(self) -> Dict:
         """Get specifications for a randomly selected laser gun."""
         if not self.laser_guns:
             return {"error": "No laser guns available"}
-        model = random.choice(list(self.laser_guns.keys()))
+        # Rows that are not objects cannot be merged into the result
+        models = [model for model, specs in self.laser_guns.items() if isinstance(specs, dict)]
+        if not models:
+            return {"error": "No laser guns available"}
+        model = random.choice(models)
         return {"model": model, **self.laser_guns[model]}
     
     def compare_laser_guns(self, model1: str, model2: str) -> Dict:
@@ -65,14 +93,18 @@ class LaserGunInterface:
         if not gun1 or not gun2:
             return {"error": "One or both models not found"}
         
+        def spec(gun, field: str) -> str:
+            # Catalogs from other divisions may leave fields out
+            return gun.get(field, "unknown") if isinstance(gun, dict) else "unknown"
+        
         comparison = {
             "model1": {model1: gun1},
             "model2": {model2: gun2},
             "comparison": {
-                "power_difference": f"{gun1['power_output']} vs {gun2['power_output']}",
-                "range_difference": f"{gun1['range']} vs {gun2['range']}",
-                "price_difference": f"{gun1['price']} vs {gun2['price']}",
-                "weight_difference": f"{gun1['weight']} vs {gun2['weight']}"
+                "power_difference": f"{spec(gun1, 'power_output')} vs {spec(gun2, 'power_output')}",
+                "range_difference": f"{spec(gun1, 'range')} vs {spec(gun2, 'range')}",
+                "price_difference": f"{spec(gun1, 'price')} vs {spec(gun2, 'price')}",
+                "weight_difference": f"{spec(gun1, 'weight')} vs {spec(gun2, 'weight')}"
             }
         }
         
@@ -83,11 +115,13 @@ class LaserGunInterface:
         if not self.laser_guns:
             return {"error": "No laser guns available"}
         
-        # Convert prices to numbers for proper comparison
-        prices = []
-        for specs in self.laser_guns.values():
-            price_str = specs["price"].replace("$", "").replace(",", "")
-            prices.append(float(price_str))
+        prices = list(self._prices.values())
+        price_range = None
+        if prices:
+            price_range = {
+                "lowest": f"${int(min(prices)):,}" if min(prices) >= 1000 else f"${int(min(prices))}",
+                "highest": f"${int(max(prices)):,}"
+            }
             
         return {
             "company": "Acme Corporation",
@@ -97,9 +131,6 @@ class LaserGunInterface:
             "specialization": "High-energy directed weapons",
             "slogan": "When you absolutely, positively need to vaporize something",
             "total_models": len(self.laser_guns),
-            "categories_available": list(set(specs["category"] for specs in self.laser_guns.values())),
-            "price_range": {
-                "lowest": f"${int(min(prices)):,}" if min(prices) >= 1000 else f"${int(min(prices))}",
-                "highest": f"${int(max(prices)):,}"
-            }
+            "categories_available": list(self._categories),
+            "price_range": price_range
         } 
\ No newline at end of file
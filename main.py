@@ -1,19 +1,20 @@
 #!/usr/bin/env python3
 
 from fastmcp import FastMCP
-from laser_gun_interface import LaserGunInterface
+from catalog_pool import CatalogPool
 from tool_registry import create_tool_registry
+from admission_control import AdmissionControl, AdmissionMiddleware
 from starlette.responses import JSONResponse
 from starlette.routing import Route
 
 # Create the MCP server
 server = FastMCP("acme-laser-guns-server")
 
-# Initialize the laser gun interface
-laser_interface = LaserGunInterface()
+# Initialize the catalog pool (catalogs load lazily on first use)
+catalogs = CatalogPool.from_env()
 
 # Create and register all tools using the registry
-registry = create_tool_registry(server, laser_interface)
+registry = create_tool_registry(server, catalogs)
 registry.register_all_tools()
 
 # Get the underlying Starlette app and add health check endpoint
@@ -26,17 +27,26 @@ async def health_check(request):
         content={
             "status": "healthy",
             "service": "acme-laser-guns-server",
-            "version": "1.0.0"
+            "version": "1.0.0",
+            "admission": admission.snapshot(),
+            "catalogs": catalogs.snapshot()
         }
     )
 
 # Add the health check route to the app
 app.routes.append(Route("/health", health_check, methods=["GET"]))
 
+# Rate limit and shed load before requests reach the MCP endpoint
+# (limits are configured through MCP_* environment variables)
+admission = AdmissionControl()
+app.add_middleware(AdmissionMiddleware, admission=admission)
+
 if __name__ == "__main__":
     # Run the server with uvicorn
     import os
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # X-Forwarded-For trust is decided by MCP_TRUST_FORWARDED_FOR in admission control,
+    # so keep uvicorn from rewriting the client address itself
+    uvicorn.run(app, host="0.0.0.0", port=port, proxy_headers=False)
     
\ No newline at end of file
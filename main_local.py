@@ -1,17 +1,17 @@
 #!/usr/bin/env python3
 
 from fastmcp import FastMCP
-from laser_gun_interface import LaserGunInterface
+from catalog_pool import CatalogPool
 from tool_registry import create_tool_registry
 
 # Create the MCP server
 server = FastMCP("acme-laser-guns-server")
 
-# Initialize the laser gun interface
-laser_interface = LaserGunInterface()
+# Initialize the catalog pool (catalogs load lazily on first use)
+catalogs = CatalogPool.from_env()
 
 # Create and register all tools using the registry
-registry = create_tool_registry(server, laser_interface)
+registry = create_tool_registry(server, catalogs)
 registry.register_all_tools()
 
 if __name__ == "__main__":
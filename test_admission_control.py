@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import pytest
+from admission_control import (
+    AdmissionConfig,
+    AdmissionControl,
+    AdmissionMiddleware,
+    ConcurrencyLimiter,
+    Overloaded,
+    RateLimiter,
+    TokenBucket,
+)
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def tool_call(name):
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": {}}
+    }).encode()
+
+async def call_app(app, body=b"", method="POST", path="/mcp", headers=None):
+    """Drive an ASGI app with a single request and collect the response."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers or [],
+        "client": ("10.0.0.1", 1234),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    content = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return start["status"], dict(start["headers"]), content
+
+async def echo_app(scope, receive, send):
+    """Minimal downstream app that echoes the request body."""
+    message = await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": message["body"]})
+
+class TestTokenBucket:
+    """Test suite for TokenBucket."""
+
+    def test_burst_then_reject(self):
+        """Test the bucket admits its capacity and then reports a wait time."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.try_acquire() == pytest.approx(0.5)
+
+    def test_refill(self):
+        """Test tokens refill over time without exceeding capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+        bucket.try_acquire()
+        bucket.try_acquire()
+        clock.now = 100.0
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() > 0
+
+class TestRateLimiter:
+    """Test suite for RateLimiter."""
+
+    def test_keys_are_independent(self):
+        """Test one exhausted key does not affect another."""
+        limiter = RateLimiter(rate=1.0, burst=1, clock=FakeClock())
+        assert limiter.check("a") == 0.0
+        assert limiter.check("a") > 0
+        assert limiter.check("b") == 0.0
+        assert limiter.stats()["rejected"] == 1
+
+    def test_lru_eviction(self):
+        """Test the number of tracked keys is bounded."""
+        limiter = RateLimiter(rate=1.0, burst=1, max_keys=2, clock=FakeClock())
+        for key in ("a", "b", "c"):
+            limiter.check(key)
+        assert list(limiter.buckets) == ["b", "c"]
+
+    def test_disabled(self):
+        """Test a zero rate disables limiting."""
+        limiter = RateLimiter(rate=0, burst=0)
+        assert all(limiter.check("a") == 0.0 for _ in range(100))
+        assert limiter.stats()["tracked_keys"] == 0
+
+class TestConcurrencyLimiter:
+    """Test suite for ConcurrencyLimiter."""
+
+    def test_sheds_when_queue_full(self):
+        """Test requests beyond the slots and queue are rejected immediately."""
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=5.0)
+            await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            assert limiter.queued == 1
+            with pytest.raises(Overloaded) as excinfo:
+                await limiter.acquire()
+            assert excinfo.value.status_code == 503
+            limiter.release()
+            await waiter
+            assert limiter.in_flight == 1
+            assert limiter.stats()["shed"] == 1
+
+        asyncio.run(scenario())
+
+    def test_queue_timeout(self):
+        """Test a queued request gives up after the queue timeout."""
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=5, queue_timeout=0.01)
+            await limiter.acquire()
+            with pytest.raises(Overloaded):
+                await limiter.acquire()
+            assert limiter.queued == 0
+
+        asyncio.run(scenario())
+
+    def test_zero_timeout_admits_free_slots_and_never_queues(self):
+        """Test queue_timeout 0 admits while slots are free and sheds instead of queueing."""
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_concurrent=2, max_queue=20, queue_timeout=0)
+            await limiter.acquire()
+            await limiter.acquire()
+            assert limiter.in_flight == 2
+            with pytest.raises(Overloaded):
+                await limiter.acquire()
+            assert limiter.queued == 0
+            assert limiter.stats()["shed"] == 1
+
+        asyncio.run(scenario())
+
+class TestAdmissionConfig:
+    """Test suite for AdmissionConfig."""
+
+    def test_from_env(self):
+        """Test limits are read from environment variables."""
+        config = AdmissionConfig.from_env({
+            "MCP_SESSION_RATE_LIMIT": "0.5",
+            "MCP_TOOL_BURST": "7",
+            "MCP_MAX_CONCURRENT": "0",
+        })
+        assert config.session_rate == 0.5
+        assert config.tool_burst == 7
+        assert config.max_concurrent == 0
+        assert config.max_queue == AdmissionConfig().max_queue
+        assert config.trust_forwarded_for is False
+        assert AdmissionConfig.from_env({"MCP_TRUST_FORWARDED_FOR": "true"}).trust_forwarded_for is True
+
+class TestAdmissionMiddleware:
+    """Test suite for AdmissionMiddleware."""
+
+    def make_app(self, **overrides):
+        config = AdmissionConfig(**overrides)
+        admission = AdmissionControl(config, clock=FakeClock())
+        return AdmissionMiddleware(echo_app, admission), admission
+
+    def test_passes_body_through(self):
+        """Test admitted requests reach the app with their body intact."""
+        app, _ = self.make_app()
+        body = tool_call("get_all_laser_guns")
+        status, _, content = asyncio.run(call_app(app, body))
+        assert status == 200
+        assert content == body
+
+    def test_tool_rate_limit(self):
+        """Test a session looping over one tool is throttled with Retry-After."""
+        app, admission = self.make_app(tool_rate=1.0, tool_burst=2)
+        headers = [(b"mcp-session-id", b"abc")]
+        for _ in range(2):
+            status, _, _ = asyncio.run(call_app(app, tool_call("get_all_laser_guns"), headers=headers))
+            assert status == 200
+        status, response_headers, content = asyncio.run(
+            call_app(app, tool_call("get_all_laser_guns"), headers=headers))
+        assert status == 429
+        assert response_headers[b"retry-after"] == b"1"
+        assert json.loads(content)["retry_after"] == 1
+        # Other tools and other sessions are unaffected
+        status, _, _ = asyncio.run(call_app(app, tool_call("get_acme_corp_info"), headers=headers))
+        assert status == 200
+        status, _, _ = asyncio.run(
+            call_app(app, tool_call("get_all_laser_guns"), headers=[(b"mcp-session-id", b"other")]))
+        assert status == 200
+        assert admission.snapshot()["tool_rate_limit"]["rejected"] == 1
+
+    def test_session_rate_limit(self):
+        """Test the per-session bucket applies to every request in the session."""
+        app, _ = self.make_app(session_rate=1.0, session_burst=1)
+        headers = [(b"mcp-session-id", b"abc")]
+        assert asyncio.run(call_app(app, b"{}", headers=headers))[0] == 200
+        assert asyncio.run(call_app(app, b"{}", headers=headers))[0] == 429
+
+    def test_rate_limited_request_body_is_not_read(self):
+        """Test a caller over its limit is rejected before the body is buffered."""
+        app, _ = self.make_app(client_rate=1.0, client_burst=1)
+        assert asyncio.run(call_app(app, b"{}"))[0] == 200
+        reads = []
+
+        async def scenario():
+            scope = {"type": "http", "method": "POST", "path": "/mcp", "headers": [],
+                     "client": ("10.0.0.1", 1234)}
+            sent = []
+
+            async def receive():
+                reads.append(1)
+                return {"type": "http.request", "body": b"{}", "more_body": False}
+
+            async def send(message):
+                sent.append(message)
+
+            await app(scope, receive, send)
+            return sent[0]["status"]
+
+        assert asyncio.run(scenario()) == 429
+        assert reads == []
+
+    def test_oversized_body_rejected(self):
+        """Test bodies above max_body_bytes are rejected with 413 and never reach the app."""
+        app, _ = self.make_app(max_body_bytes=16)
+        status, _, content = asyncio.run(call_app(app, b"x" * 17))
+        assert status == 413
+        assert json.loads(content) == {"error": "Request body too large"}
+        assert asyncio.run(call_app(app, b"x" * 16))[0] == 200
+
+    def test_rotating_session_ids_hit_client_limit(self):
+        """Test a client cannot bypass limits or churn buckets with fresh session IDs."""
+        app, admission = self.make_app(client_rate=1.0, client_burst=3,
+                                       session_burst=1, tool_burst=1)
+        statuses = []
+        for i in range(10):
+            headers = [(b"mcp-session-id", f"forged-{i}".encode())]
+            statuses.append(asyncio.run(call_app(app, tool_call("get_all_laser_guns"), headers=headers))[0])
+        assert statuses == [200] * 3 + [429] * 7
+        snapshot = admission.snapshot()
+        assert snapshot["client_rate_limit"]["rejected"] == 7
+        assert snapshot["session_rate_limit"]["tracked_keys"] == 3
+
+    def test_forwarded_for_ignored_by_default(self):
+        """Test X-Forwarded-For cannot be used to pick a fresh client bucket unless trusted."""
+        app, _ = self.make_app(client_rate=1.0, client_burst=1)
+        assert asyncio.run(call_app(app, b"{}", headers=[(b"x-forwarded-for", b"1.1.1.1")]))[0] == 200
+        assert asyncio.run(call_app(app, b"{}", headers=[(b"x-forwarded-for", b"2.2.2.2")]))[0] == 429
+
+    def test_forwarded_for_trusted_uses_last_hop(self):
+        """Test a trusted X-Forwarded-For is keyed on the hop added by our proxy."""
+        app, admission = self.make_app(client_rate=1.0, client_burst=1, trust_forwarded_for=True)
+        forged = [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")]
+        assert asyncio.run(call_app(app, b"{}", headers=forged))[0] == 200
+        forged = [(b"x-forwarded-for", b"7.7.7.7, 203.0.113.7")]
+        assert asyncio.run(call_app(app, b"{}", headers=forged))[0] == 429
+        assert list(admission.clients.buckets) == ["203.0.113.7"]
+
+    def test_only_mcp_posts_are_limited(self):
+        """Test SSE streams and other paths bypass admission control."""
+        app, admission = self.make_app(session_rate=1.0, session_burst=1)
+        for _ in range(3):
+            assert asyncio.run(call_app(app, method="GET"))[0] == 200
+            assert asyncio.run(call_app(app, path="/health"))[0] == 200
+            assert asyncio.run(call_app(app, path="/mcp/"))[0] == 200
+        assert admission.snapshot()["session_rate_limit"]["tracked_keys"] == 0
+
+    def test_overload_returns_503(self):
+        """Test a full server sheds load with 503 and Retry-After."""
+        app, admission = self.make_app(max_concurrent=1, max_queue=0, queue_timeout=3.0)
+
+        async def scenario():
+            await admission.concurrency.acquire()
+            return await call_app(app, b"{}")
+
+        status, headers, _ = asyncio.run(scenario())
+        assert status == 503
+        assert headers[b"retry-after"] == b"3"
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+import pytest
+import json
+import os
+import threading
+import catalog_pool
+from catalog_pool import CatalogPool
+from tool_registry import create_tool_registry
+
+def make_catalog(directory, name, category, price, padding=0):
+    """Write a one-model catalog file and return its path."""
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, 'w') as f:
+        json.dump({
+            f"{name}_blaster": {
+                "name": f"{name.title()} Blaster",
+                "category": category,
+                "price": price,
+                "notes": "x" * padding
+            }
+        }, f)
+    return path
+
+class FakeServer:
+    """Collects tools registered through server.tool()."""
+
+    def __init__(self):
+        self.tools = {}
+
+    def tool(self):
+        def decorator(func):
+            self.tools[func.__name__] = func
+            return func
+        return decorator
+
+class TestCatalogPool:
+    """Test suite for CatalogPool class."""
+
+    @pytest.fixture
+    def catalog_files(self, tmp_path):
+        """Three catalog files of roughly equal size."""
+        return {
+            "acme": make_catalog(tmp_path, "acme", "Handheld", "$1,299", padding=1000),
+            "road_runner": make_catalog(tmp_path, "road_runner", "Rifle", "$499", padding=1000),
+            "coyote": make_catalog(tmp_path, "coyote", "Handheld", "$9,999", padding=1000),
+        }
+
+    def test_lazy_loading(self, catalog_files):
+        """Test catalogs are only loaded on first use and then reused."""
+        pool = CatalogPool(catalog_files)
+        assert pool.snapshot()["loaded"] == []
+        interface = pool.get("coyote")
+        assert pool.get("coyote") is interface
+        assert pool.loads == 1
+        assert "coyote_blaster" in interface.get_all_laser_guns()
+
+    def test_default_catalog(self, catalog_files):
+        """Test omitting the catalog uses the default."""
+        pool = CatalogPool(catalog_files)
+        assert "acme_blaster" in pool.get().get_all_laser_guns()
+        assert "acme_blaster" in pool.get(None).get_all_laser_guns()
+
+    def test_unknown_catalog(self, catalog_files):
+        """Test unknown catalogs raise KeyError."""
+        pool = CatalogPool(catalog_files)
+        with pytest.raises(KeyError):
+            pool.get("wile_e")
+
+    def test_default_must_be_configured(self, catalog_files):
+        """Test the default catalog has to be one of the configured catalogs."""
+        with pytest.raises(ValueError):
+            CatalogPool(catalog_files, default_catalog="wile_e")
+
+    def test_lru_eviction_under_budget(self, catalog_files):
+        """Test least recently used catalogs are evicted to fit the data budget."""
+        budget = os.path.getsize(catalog_files["acme"]) + os.path.getsize(catalog_files["road_runner"])
+        pool = CatalogPool(catalog_files, data_budget_bytes=budget)
+        pool.get("acme")
+        pool.get("road_runner")
+        pool.get("acme")
+        pool.get("coyote")
+        assert list(pool.loaded) == ["acme", "coyote"]
+        assert pool.evictions == 1
+        assert pool.data_bytes <= budget
+
+    def test_single_catalog_over_budget_is_kept(self, catalog_files):
+        """Test the requested catalog is served even if it alone exceeds the budget."""
+        pool = CatalogPool(catalog_files, data_budget_bytes=1)
+        pool.get("acme")
+        pool.get("coyote")
+        assert list(pool.loaded) == ["coyote"]
+
+    def test_from_env(self, tmp_path, catalog_files):
+        """Test catalogs are configured from environment variables."""
+        extra = make_catalog(tmp_path / "..", "marvin", "Heavy Weapon", "$50,000")
+        pool = CatalogPool.from_env({
+            "LASER_GUNS_FILE": catalog_files["acme"],
+            "CATALOG_DIR": str(tmp_path),
+            "CATALOGS": f"martian={extra}",
+            "CATALOG_DATA_BUDGET_MB": "1",
+        })
+        assert pool.names() == ["acme", "coyote", "martian", "road_runner"]
+        assert pool.default_catalog == "acme"
+        assert pool.data_budget_bytes == 1024 * 1024
+        assert "marvin_blaster" in pool.get("martian").get_all_laser_guns()
+
+    def test_duplicate_name_raises(self, tmp_path):
+        """Test a CATALOG_DIR file cannot silently replace the default catalog."""
+        default_file = make_catalog(tmp_path, "laser_guns", "Handheld", "$1,299")
+        other_dir = tmp_path / "division"
+        other_dir.mkdir()
+        make_catalog(other_dir, "acme", "Rifle", "$499")
+        with pytest.raises(ValueError):
+            CatalogPool.from_env({"LASER_GUNS_FILE": default_file, "CATALOG_DIR": str(other_dir)})
+        with pytest.raises(ValueError):
+            CatalogPool.from_env({"LASER_GUNS_FILE": default_file, "CATALOGS": f"acme={default_file}"})
+
+    def test_default_file_in_catalog_dir_is_not_duplicated(self, tmp_path):
+        """Test the default catalog's own file is not registered a second time."""
+        default_file = make_catalog(tmp_path, "laser_guns", "Handheld", "$1,299")
+        make_catalog(tmp_path, "coyote", "Rifle", "$499")
+        pool = CatalogPool.from_env({"LASER_GUNS_FILE": default_file, "CATALOG_DIR": str(tmp_path)})
+        assert pool.names() == ["acme", "coyote"]
+
+    def test_cold_load_does_not_block_loaded_catalogs(self, catalog_files, monkeypatch):
+        """Test lookups of a loaded catalog proceed while another catalog is loading."""
+        pool = CatalogPool(catalog_files)
+        acme = pool.get("acme")
+        loading = threading.Event()
+        release = threading.Event()
+        real_interface = catalog_pool.LaserGunInterface
+
+        def slow_interface(data_file):
+            loading.set()
+            release.wait(5)
+            return real_interface(data_file)
+
+        monkeypatch.setattr(catalog_pool, "LaserGunInterface", slow_interface)
+        loader = threading.Thread(target=pool.get, args=("coyote",))
+        loader.start()
+        try:
+            assert loading.wait(5)
+            assert pool.get("acme") is acme
+            assert pool.snapshot()["loaded"] == ["acme"]
+        finally:
+            release.set()
+            loader.join(5)
+        assert pool.snapshot()["loaded"] == ["acme", "coyote"]
+
+    def test_unparseable_catalog_raises_load_error(self, tmp_path):
+        """Test a catalog file that is not valid JSON raises CatalogLoadError."""
+        broken = tmp_path / "broken.json"
+        broken.write_text("{not json")
+        pool = CatalogPool({"acme": make_catalog(tmp_path, "acme", "Handheld", "$1,299"),
+                            "broken": str(broken)})
+        with pytest.raises(catalog_pool.CatalogLoadError):
+            pool.get("broken")
+        assert pool.snapshot()["loaded"] == []
+
+    def test_missing_file_raises_load_error(self, tmp_path):
+        """Test a mistyped catalog path is an error, not an empty healthy catalog."""
+        pool = CatalogPool.from_env({
+            "LASER_GUNS_FILE": make_catalog(tmp_path, "acme", "Handheld", "$1,299"),
+            "CATALOGS": f"roadrunner={tmp_path / 'missing' / 'rr.json'}",
+        })
+        with pytest.raises(catalog_pool.CatalogLoadError) as excinfo:
+            pool.get("roadrunner")
+        assert "data file not found" in str(excinfo.value)
+        assert pool.snapshot()["loaded"] == []
+
+    def test_missing_default_file_loads_empty(self, tmp_path, capsys):
+        """Test the default catalog keeps the legacy empty-database fallback."""
+        pool = CatalogPool({"acme": str(tmp_path / "missing.json")})
+        assert pool.get().get_all_laser_guns() == {}
+        assert "not found" in capsys.readouterr().out
+
+    def test_empty_catalog_name_raises(self, tmp_path):
+        """Test a CATALOGS entry without a name is rejected."""
+        path = make_catalog(tmp_path, "coyote", "Rifle", "$499")
+        with pytest.raises(ValueError):
+            CatalogPool.from_env({"CATALOGS": f"={path}"})
+        with pytest.raises(ValueError):
+            CatalogPool.from_env({"CATALOGS": f" ={path}"})
+
+class TestToolRegistryCatalogs:
+    """Test catalog routing in the tool registry."""
+
+    @pytest.fixture
+    def tools(self, tmp_path):
+        malformed = tmp_path / "malformed.json"
+        malformed.write_text(json.dumps({
+            "quote_blaster": {"name": "Quote Blaster", "category": "Handheld", "price": "call for quote"},
+            "mystery_ray": {"name": "Mystery Ray", "price": "$750"},
+            "retired_beam": "discontinued",
+        }))
+        broken = tmp_path / "broken.json"
+        broken.write_text("{not json")
+        pool = CatalogPool({
+            "acme": make_catalog(tmp_path, "acme", "Handheld", "$1,299"),
+            "coyote": make_catalog(tmp_path, "coyote", "Handheld", "$9,999"),
+            "malformed": str(malformed),
+            "broken": str(broken),
+        })
+        server = FakeServer()
+        create_tool_registry(server, pool).register_all_tools()
+        return server.tools
+
+    def test_catalog_argument(self, tools):
+        """Test tools query the requested catalog, defaulting when omitted."""
+        assert list(tools["get_laser_guns_by_category"]("handheld")) == ["acme_blaster"]
+        assert list(tools["get_laser_guns_by_category"]("handheld", catalog="coyote")) == ["coyote_blaster"]
+        assert tools["get_laser_guns_by_price_range"](5000, 10000, catalog="coyote") != {}
+
+    def test_unknown_catalog(self, tools):
+        """Test an unknown catalog returns an error listing the available catalogs."""
+        result = tools["get_all_laser_guns"](catalog="wile_e")
+        assert result == {"error": "Unknown catalog: wile_e",
+                          "available_catalogs": ["acme", "broken", "coyote", "malformed"]}
+
+    def test_list_catalogs(self, tools):
+        """Test the list_catalogs tool."""
+        assert tools["list_catalogs"]() == {"catalogs": ["acme", "broken", "coyote", "malformed"],
+                                            "default": "acme"}
+
+    def test_malformed_rows_are_skipped(self, tools, capsys):
+        """Test rows with a bad price or category only drop out of the affected queries."""
+        assert set(tools["get_all_laser_guns"](catalog="malformed")) == {
+            "quote_blaster", "mystery_ray", "retired_beam"}
+        assert tools["get_laser_gun_by_model"]("quote_blaster", catalog="malformed")["price"] == "call for quote"
+        assert list(tools["get_laser_guns_by_category"]("handheld", catalog="malformed")) == ["quote_blaster"]
+        assert list(tools["get_laser_guns_by_price_range"](0, 10000, catalog="malformed")) == ["mystery_ray"]
+        info = tools["get_acme_corp_info"](catalog="malformed")
+        assert info["categories_available"] == ["Handheld"]
+        assert info["price_range"] == {"lowest": "$750", "highest": "$750"}
+        captured = capsys.readouterr()
+        assert "quote_blaster" in captured.out and "mystery_ray" in captured.out
+
+    def test_compare_and_random_tolerate_malformed_rows(self, tools):
+        """Test compare and random selection work on rows with missing fields or non-object rows."""
+        result = tools["compare_laser_guns"]("quote_blaster", "mystery_ray", catalog="malformed")
+        assert result["comparison"]["price_difference"] == "call for quote vs $750"
+        assert result["comparison"]["power_difference"] == "unknown vs unknown"
+        result = tools["compare_laser_guns"]("quote_blaster", "retired_beam", catalog="malformed")
+        assert result["comparison"]["weight_difference"] == "unknown vs unknown"
+        for _ in range(50):
+            assert tools["get_random_laser_gun"](catalog="malformed")["model"] in {"quote_blaster", "mystery_ray"}
+
+    def test_load_error_is_not_unknown_catalog(self, tools):
+        """Test a catalog that fails to load is reported as a load failure."""
+        result = tools["get_all_laser_guns"](catalog="broken")
+        assert result["error"].startswith("Failed to load catalog 'broken'")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -212,6 +212,13 @@ class TestLaserGunInterface:
         result = interface.get_acme_corp_info()
         assert result == {"error": "No laser guns available"}
     
+    def test_non_object_json_raises(self, tmp_path):
+        """Test a data file that is not a JSON object of models is rejected."""
+        data_file = tmp_path / "list.json"
+        data_file.write_text("[]")
+        with pytest.raises(ValueError):
+            LaserGunInterface(str(data_file))
+    
     def test_interface_initialization_with_custom_file(self, temp_json_file):
         """Test interface initialization with custom file path."""
         interface = LaserGunInterface(temp_json_file)
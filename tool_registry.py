@@ -6,52 +6,69 @@ Simple, readable tool definitions
 
 from typing import Dict, Any, Callable, Optional, Type
 
+from catalog_pool import CatalogLoadError
+
 class ToolRegistry:
     """Simple registry for MCP tools"""
     
-    def __init__(self, server, interface):
+    def __init__(self, server, catalogs):
         self.server = server
-        self.interface = interface
+        self.catalogs = catalogs
+    
+    def _call(self, catalog: Optional[str], method: str, *args):
+        """Run an interface method against the requested catalog (default if omitted)."""
+        if not self.catalogs.has(catalog):
+            return {"error": f"Unknown catalog: {catalog}", "available_catalogs": self.catalogs.names()}
+        try:
+            interface = self.catalogs.get(catalog)
+        except CatalogLoadError as exc:
+            return {"error": str(exc)}
+        return getattr(interface, method)(*args)
     
     def register_all_tools(self):
         """Register all laser gun tools"""
         
         @self.server.tool()
-        def get_all_laser_guns():
-            """Get specifications for all available laser guns from Acme Corp."""
-            return self.interface.get_all_laser_guns()
+        def list_catalogs():
+            """List the product catalogs served by this server. Pass one of these names as `catalog` to the other tools."""
+            return {"catalogs": self.catalogs.names(), "default": self.catalogs.default_catalog}
+        
+        @self.server.tool()
+        def get_all_laser_guns(catalog: Optional[str] = None):
+            """Get specifications for all available laser guns from Acme Corp. Optional `catalog` selects the product catalog (see list_catalogs); omit it for the default."""
+            return self._call(catalog, "get_all_laser_guns")
         
         @self.server.tool()
-        def get_laser_gun_by_model(model: str):
-            """Get specifications for a specific laser gun by model name."""
-            return self.interface.get_laser_gun_by_model(model)
+        def get_laser_gun_by_model(model: str, catalog: Optional[str] = None):
+            """Get specifications for a specific laser gun by model name. Optional `catalog` selects the product catalog (see list_catalogs); omit it for the default."""
+            return self._call(catalog, "get_laser_gun_by_model", model)
         
         @self.server.tool()
-        def get_laser_guns_by_category(category: str):
-            """Get all laser guns in a specific category."""
-            return self.interface.get_laser_guns_by_category(category)
+        def get_laser_guns_by_category(category: str, catalog: Optional[str] = None):
+            """Get all laser guns in a specific category. Optional `catalog` selects the product catalog (see list_catalogs); omit it for the default."""
+            return self._call(catalog, "get_laser_guns_by_category", category)
         
         @self.server.tool()
-        def get_laser_guns_by_price_range(min_price: float, max_price: float):
-            """Get laser guns within a specific price range (in USD)."""
-            return self.interface.get_laser_guns_by_price_range(min_price, max_price)
+        def get_laser_guns_by_price_range(min_price: float, max_price: float, catalog: Optional[str] = None):
+            """Get laser guns within a specific price range (in USD). Optional `catalog` selects the product catalog (see list_catalogs); omit it for the default."""
+            return self._call(catalog, "get_laser_guns_by_price_range", min_price, max_price)
         
         @self.server.tool()
-        def get_random_laser_gun():
-            """Get specifications for a randomly selected laser gun."""
-            return self.interface.get_random_laser_gun()
+        def get_random_laser_gun(catalog: Optional[str] = None):
+            """Get specifications for a randomly selected laser gun. Optional `catalog` selects the product catalog (see list_catalogs); omit it for the default."""
+            return self._call(catalog, "get_random_laser_gun")
         
         @self.server.tool()
-        def compare_laser_guns(model1: str, model2: str):
-            """Compare specifications between two laser gun models."""
-            return self.interface.compare_laser_guns(model1, model2)
+        def compare_laser_guns(model1: str, model2: str, catalog: Optional[str] = None):
+            """Compare specifications between two laser gun models. Optional `catalog` selects the product catalog (see list_catalogs); omit it for the default."""
+            return self._call(catalog, "compare_laser_guns", model1, model2)
         
         @self.server.tool()
-        def get_acme_corp_info():
-            """Get information about Acme Corp and their laser gun division."""
-            return self.interface.get_acme_corp_info()
+        def get_acme_corp_info(catalog: Optional[str] = None):
+            """Get information about Acme Corp and their laser gun division. Optional `catalog` selects the product catalog (see list_catalogs); omit it for the default. Company details are always Acme's; model counts, categories and prices come from the selected catalog."""
+            return self._call(catalog, "get_acme_corp_info")
 
-def create_tool_registry(server, interface):
+def create_tool_registry(server, catalogs):
     """Create and configure a tool registry for laser guns"""
-    registry = ToolRegistry(server, interface)
+    registry = ToolRegistry(server, catalogs)
     return registry 
\ No newline at end of file